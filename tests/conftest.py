@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def toy_data():
+    """Small separable problem: class 1 when the first feature is large"""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-1, 1, size=(300, 4))
+    y = (X[:, 0] > 0.4).astype(int)
+    return X, y
+
+
+@pytest.fixture
+def make_forest():
+    """Factory for a small, fast forest; keyword arguments override the defaults"""
+    from ensemble_roct import ROCTRandomForest
+
+    def make(**params):
+        params = {'n_estimators': 3, 'max_depth': 1, 'max_samples': 150, 'time_limit': 30,
+                  'use_gpu': False, 'solver': 'highs', **params}
+        return ROCTRandomForest(**params)
+    return make
+
+
+@pytest.fixture
+def make_boosting():
+    """Factory for a small, fast boosting model; keyword arguments override the defaults"""
+    from ensemble_roct import ROCTGradientBoosting
+
+    def make(**params):
+        params = {'n_estimators': 3, 'max_depth': 1, 'max_samples': 150, 'time_limit': 30,
+                  'solver': 'highs', **params}
+        return ROCTGradientBoosting(**params)
+    return make
@@ -0,0 +1,30 @@
+import numpy as np
+
+from ensemble_roct import CompiledEnsemble
+
+
+def test_predict_uses_each_stage_learning_rate(toy_data, make_boosting):
+    X, y = toy_data
+    model = make_boosting().fit(X, y)
+
+    expected_rates = [model._stage_learning_rate(i) for i in range(len(model.trees))]
+    np.testing.assert_allclose(model.learning_rates_, expected_rates)
+    assert len(set(expected_rates)) == len(expected_rates)
+
+    X_scaled = model.scaler.transform(X)
+    margin = np.full(len(X), model.base_score)
+    for rate, tree in zip(model.learning_rates_, model.trees):
+        margin += rate * CompiledEnsemble([tree]).accumulate(X_scaled, np.ones(1), np.zeros(len(X)))
+    proba = np.clip(1 / (1 + np.exp(-margin)), 0.001, 0.999)
+    np.testing.assert_allclose(model.predict_proba(X)[:, 1], proba)
+
+
+def test_validation_split_keeps_a_lone_positive_in_training(toy_data, make_boosting):
+    X, _ = toy_data
+    y = np.zeros(len(X), dtype=int)
+    y[5] = 1
+
+    model = make_boosting(validation_fraction=0.2).fit(X, y)
+
+    assert len(model.trees) > 0
+    assert not model.failed_trees_
@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+import pytest
+
+import ensemble_roct
+from ensemble_roct import CBCGapMonitor, TimeBudget
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Wall clock under the test's control"""
+    now = [1000.0]
+    monkeypatch.setattr(ensemble_roct.time, 'time', lambda: now[0])
+    return now
+
+
+def test_budget_rolls_unused_seconds_over(clock):
+    budget = TimeBudget(90, 3)
+
+    assert budget.allocate() == pytest.approx(30)
+    clock[0] += 5  # A fast solve leaves 25 of its 30 seconds
+    assert budget.allocate() == pytest.approx(42.5)
+    clock[0] += 42.5
+    assert budget.allocate() == pytest.approx(42.5)
+
+
+def test_budget_shares_waves_of_parallel_solves(clock):
+    budget = TimeBudget(60, 4)
+
+    # Four trees on two workers run in two waves of 30 seconds
+    assert budget.allocate(n_parallel=2) == pytest.approx(30)
+    assert budget.allocate(n_parallel=2) == pytest.approx(30)
+
+
+def test_budget_stops_below_the_minimum_slice(clock):
+    budget = TimeBudget(10, 2, min_slice=6)
+
+    assert budget.allocate() == 0.0
+    clock[0] += 100
+    assert budget.remaining() == 0.0
+
+
+def test_monitor_tracks_incumbent_bound_and_gap():
+    monitor = CBCGapMonitor()
+    monitor.start()
+    try:
+        monitor._parse('Cbc0013I At root node, 12 cuts changed objective from 1 to 4 in 5 passes', 0.1)
+        monitor._parse('Cbc0012I Integer solution of 10 found by heuristic after 3 iterations', 0.2)
+        monitor._parse('Cbc0010I After 100 nodes, 7 on tree, 8 best solution, best possible 6 (1.5 seconds)', 1.5)
+    finally:
+        monitor.stop()
+
+    assert (monitor.incumbent, monitor.bound) == (8.0, 6.0)
+    assert monitor.gap() == pytest.approx(0.25)
+    assert [point['gap'] for point in monitor.timeline] == [None, pytest.approx(0.6), pytest.approx(0.25)]
+
+
+def test_monitor_interrupts_a_stalled_solve():
+    monitor = CBCGapMonitor(stall_time=0.2, poll_interval=0.05)
+    interrupts = []
+
+    def interrupt():
+        interrupts.append(time.perf_counter())
+        monitor.interrupted = True
+    monitor._interrupt = interrupt
+
+    monitor._parse('Cbc0012I Integer solution of 10 found by heuristic after 3 iterations', 0.0)
+    monitor.start()
+    time.sleep(0.6)
+    monitor.stop()
+
+    assert len(interrupts) == 1
+    assert monitor.interrupted
+    assert np.isinf(monitor.gap())
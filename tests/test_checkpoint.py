@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def checkpointed(make_forest, tmp_path):
+    """Forest factory checkpointing into the test's temporary directory"""
+    return lambda **params: make_forest(checkpoint_dir=str(tmp_path), **params)
+
+
+def test_forest_resume_retrains_only_missing_trees(toy_data, tmp_path, checkpointed):
+    X, y = toy_data
+    full = checkpointed().fit(X, y)
+    expected = full.predict_proba(X)
+
+    # Simulate an interruption before the last tree was saved
+    for ext in ('npz', 'json'):
+        os.remove(tmp_path / f'tree_00002.{ext}')
+    restored_mtime = os.path.getmtime(tmp_path / 'tree_00000.npz')
+
+    resumed = checkpointed().fit(X, y, resume=True)
+    assert len(resumed.trees) == 3
+    assert os.path.exists(tmp_path / 'tree_00002.npz')
+    assert os.path.getmtime(tmp_path / 'tree_00000.npz') == restored_mtime
+    np.testing.assert_array_equal(resumed.predict_proba(X), expected)
+
+
+def test_forest_resume_accepts_new_time_limit(toy_data, checkpointed):
+    X, y = toy_data
+    expected = checkpointed().fit(X, y).predict_proba(X)
+
+    resumed = checkpointed(time_limit=10).fit(X, y, resume=True)
+    np.testing.assert_array_equal(resumed.predict_proba(X), expected)
+
+
+def test_resume_rejects_checkpoint_with_different_params(toy_data, checkpointed):
+    X, y = toy_data
+    checkpointed().fit(X, y)
+
+    with pytest.raises(ValueError, match="different data or parameters"):
+        checkpointed(max_depth=2).fit(X, y, resume=True)
+
+
+def test_resume_rejects_checkpoint_for_different_data(toy_data, checkpointed):
+    X, y = toy_data
+    checkpointed().fit(X, y)
+
+    with pytest.raises(ValueError, match="different data or parameters"):
+        checkpointed().fit(X * 2, y, resume=True)
+
+
+def test_boosting_resume_restores_finished_fit(toy_data, tmp_path, make_boosting):
+    X, y = toy_data
+    expected = make_boosting(n_estimators=2, checkpoint_dir=str(tmp_path)).fit(X, y).predict_proba(X)
+
+    resumed = make_boosting(n_estimators=2, checkpoint_dir=str(tmp_path)).fit(X, y, resume=True)
+    np.testing.assert_allclose(resumed.predict_proba(X), expected)
+
+
+def test_checkpointed_fit_does_not_print(toy_data, checkpointed, capsys):
+    X, y = toy_data
+    checkpointed().fit(X, y)
+    checkpointed().fit(X, y, resume=True)
+
+    assert capsys.readouterr().out == ''
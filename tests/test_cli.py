@@ -0,0 +1,20 @@
+import pytest
+
+from ensemble_roct import _argument_parser
+
+
+@pytest.mark.parametrize('argv, verbose', [
+    (['compare', 'data.csv'], False),
+    (['compare', 'data.csv', '--verbose'], True),
+    (['--verbose', 'compare', 'data.csv'], True),
+    (['benchmark', '--verbose'], True),
+    (['benchmark'], False),
+])
+def test_verbose_is_accepted_around_the_subcommand(argv, verbose):
+    args = _argument_parser().parse_args(argv)
+    assert args.verbose is verbose
+
+
+def test_subcommand_is_required():
+    with pytest.raises(SystemExit):
+        _argument_parser().parse_args([])
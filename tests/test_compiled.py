@@ -0,0 +1,24 @@
+import numpy as np
+
+from ensemble_roct import CompiledEnsemble, ROCTTree
+
+
+def test_tree_predict_matches_reference_traversal(toy_data):
+    X, y = toy_data
+    tree = ROCTTree(max_depth=2, time_limit=30, use_gpu=False, solver='highs').fit(X, y)
+
+    rng = np.random.default_rng(3)
+    X_new = np.vstack([X, rng.uniform(-2, 2, size=(200, X.shape[1]))])
+    np.testing.assert_array_equal(tree.predict(X_new), tree._predict_reference(X_new))
+
+
+def test_forest_engine_matches_averaged_tree_votes(toy_data, make_forest):
+    X, y = toy_data
+    forest = make_forest().fit(X, y)
+
+    X_scaled = forest.scaler.transform(X)
+    votes = np.mean([tree._predict_reference(X_scaled) for tree in forest.trees], axis=0)
+    np.testing.assert_allclose(forest.predict_proba(X)[:, 1], np.clip(votes, 0.001, 0.999))
+
+    engine = CompiledEnsemble(forest.trees)
+    np.testing.assert_array_equal(engine.apply(X_scaled)[0], forest.trees[0].apply(X_scaled))
@@ -0,0 +1,48 @@
+import numpy as np
+
+from ensemble_roct import ROCTTree, compress_samples
+
+
+def test_dedup_merges_repeated_rows_into_their_weight(toy_data):
+    X, y = toy_data
+    X_c, y_c, w_c = compress_samples(np.vstack([X, X[:50]]), np.r_[y, y[:50]], method='dedup')
+
+    assert len(y_c) == len(y)
+    assert w_c.sum() == len(y) + 50
+    repeated = np.isin(X_c[:, 0], X[:50, 0])
+    np.testing.assert_array_equal(w_c[repeated], 2)
+    np.testing.assert_array_equal(w_c[~repeated], 1)
+
+
+def test_coreset_keeps_each_class_weight_within_budget(toy_data):
+    X, y = toy_data
+    weights = np.linspace(0.5, 1.5, len(y))
+    X_c, y_c, w_c = compress_samples(X, y, sample_weight=weights, method='coreset',
+                                     coreset_size=40)
+
+    assert len(y_c) <= 40
+    assert np.sum(y_c == 1) <= 20
+    for label in (0, 1):
+        assert np.isclose(w_c[y_c == label].sum(), weights[y == label].sum())
+    # Centers stay inside the range of the rows they summarise
+    assert np.all(X_c >= X.min(axis=0)) and np.all(X_c <= X.max(axis=0))
+
+
+def test_quantize_merges_rows_per_grid_cell(toy_data):
+    X, y = toy_data
+    X_c, y_c, w_c = compress_samples(X, y, method='quantize', n_bins=2)
+
+    # Two bins on four features, split by label
+    assert len(y_c) <= 2 ** 4 * 2
+    assert w_c.sum() == len(y)
+    assert set(np.unique(y_c)) <= {0.0, 1.0}
+
+
+def test_dedup_compressed_fit_matches_fit_on_unique_rows(toy_data):
+    X, y = toy_data
+    X, y = X[:120], y[:120]
+    params = dict(max_depth=1, time_limit=30, use_gpu=False, solver='highs')
+    plain = ROCTTree(**params).fit(X, y, sample_weight=np.full(len(y), 2.0))
+    compressed = ROCTTree(compression='dedup', **params).fit(np.vstack([X, X]), np.r_[y, y])
+
+    np.testing.assert_array_equal(compressed.predict(X), plain.predict(X))
@@ -0,0 +1,29 @@
+import pytest
+
+from ensemble_roct import ROCTTree, evaluate_conditions
+
+
+@pytest.fixture
+def fitted_tree(toy_data):
+    X, y = toy_data
+    return ROCTTree(max_depth=1, time_limit=30, use_gpu=False, solver='highs').fit(X, y)
+
+
+def test_zero_and_duplicate_epsilons(fitted_tree, toy_data):
+    X, y = toy_data
+    results = evaluate_conditions(fitted_tree, X, y, epsilons=[0.0, 0.1, 0.1], chunk_size=64)
+
+    assert list(results['adversarial']) == [0.0, 0.1]
+    # Zero noise scores exactly like the clean data
+    for metric in ('accuracy', 'roc_auc', 'f1'):
+        assert results['adversarial'][0.0][metric] == results['clean'][metric]
+    assert 'certified_accuracy' in results['adversarial'][0.1]
+
+
+def test_clean_metrics_do_not_depend_on_epsilons(fitted_tree, toy_data):
+    X, y = toy_data
+    alone = evaluate_conditions(fitted_tree, X, y, epsilons=[0.1], verify=False)
+    with_zero = evaluate_conditions(fitted_tree, X, y, epsilons=[0.0, 0.1], verify=False)
+
+    assert alone['clean']['accuracy'] == with_zero['clean']['accuracy']
+    assert alone['adversarial'][0.1]['accuracy'] == with_zero['adversarial'][0.1]['accuracy']
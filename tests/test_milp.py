@@ -0,0 +1,117 @@
+import numpy as np
+
+import ensemble_roct
+from ensemble_roct import ROCTTree
+
+
+def _assemble(X, y):
+    tree = ROCTTree(max_depth=2, solver='highs', use_gpu=False)
+    return tree._assemble_sparse_milp(X, y)
+
+
+def test_cached_skeleton_matches_uncached_assembly():
+    rng = np.random.default_rng(1)
+    X_first, X_second = rng.normal(size=(2, 40, 3))
+    y_first, y_second = rng.integers(0, 2, size=(2, 40))
+
+    # Fill the cache with one tree's data, then assemble another of the same shape
+    ensemble_roct._bigm_skeleton.cache_clear()
+    _assemble(X_first, y_first)
+    cached = _assemble(X_second, y_second)
+    assert ensemble_roct._bigm_skeleton.cache_info().hits == 1
+
+    ensemble_roct._bigm_skeleton.cache_clear()
+    fresh = _assemble(X_second, y_second)
+
+    assert (cached['A'] != fresh['A']).nnz == 0
+    for key in ('cost', 'integrality', 'lb', 'ub', 'row_lb', 'row_ub'):
+        np.testing.assert_array_equal(cached[key], fresh[key])
+
+
+def test_forest_trees_reuse_cached_skeleton(toy_data, make_forest):
+    X, y = toy_data
+    ensemble_roct._bigm_skeleton.cache_clear()
+    forest = make_forest().fit(X, y)
+
+    assert len(forest.trees) == 3
+    assert all(tree.solver == 'highs' for tree in forest.trees)
+    assert ensemble_roct._bigm_skeleton.cache_info().hits >= 2
+
+
+def test_boosting_trees_use_configured_solver(toy_data, make_boosting):
+    X, y = toy_data
+    boosting = make_boosting(n_estimators=2, formulation='binarized').fit(X, y)
+
+    assert len(boosting.trees) == 2
+    assert all(tree.solver == 'highs' and tree.formulation == 'binarized'
+               for tree in boosting.trees)
+
+
+def test_constraint_generation_converges_only_on_optimal_rounds(toy_data, monkeypatch):
+    X, y = toy_data
+    tree = ROCTTree(max_depth=1, time_limit=30, use_gpu=False, solver='highs',
+                    constraint_generation=True, seed_samples=40)
+    tree.fit(X[:120], y[:120])
+    assert tree.profile_['status'] == 'Optimal'
+    assert tree.cg_history_[-1]['n_violated'] == 0
+
+    # Every round now hits its time limit with an unproven incumbent
+    monkeypatch.setattr(ensemble_roct, '_highs_status', lambda result: 'Feasible')
+    tree.fit(X[:120], y[:120])
+    assert tree.profile_['status'] == 'Feasible'
+    assert all(round_['status'] == 'Feasible' for round_ in tree.cg_history_)
+
+
+def test_decomposed_fit_reports_worst_subproblem_status(toy_data, monkeypatch):
+    X, y = toy_data
+    tree = ROCTTree(max_depth=2, time_limit=30, use_gpu=False, solver='highs',
+                    decomposition_depth=1)
+    tree.fit(X, y)
+
+    assert len(tree.profile_['subproblems']) >= 2
+    assert tree.profile_['status'] == 'Optimal'
+    assert tree.profile_['n_nonoptimal_subproblems'] == 0
+    assert np.mean(tree.predict(X) == y) > 0.9
+
+    # A later subproblem that hits its time limit must not be hidden by the first
+    statuses = iter(['Optimal', 'Feasible'])
+    monkeypatch.setattr(ensemble_roct, '_highs_status', lambda result: next(statuses, 'Optimal'))
+    tree.fit(X, y)
+    assert tree.profile_['status'] == 'Feasible'
+    assert tree.profile_['n_nonoptimal_subproblems'] == 1
+
+
+def test_binarized_tree_splits_on_a_candidate_threshold(toy_data):
+    X, y = toy_data
+    X_train, y_train = X[:120], y[:120]
+    bigm = ROCTTree(max_depth=1, time_limit=30, use_gpu=False, solver='highs').fit(X_train, y_train)
+    binarized = ROCTTree(max_depth=1, time_limit=30, use_gpu=False, solver='highs',
+                         formulation='binarized', n_thresholds=None).fit(X_train, y_train)
+
+    assert binarized.profile_['status'] == 'Optimal'
+    assert binarized.feature_[0] == 0
+    cand_feature, cand_threshold = binarized._candidate_thresholds(
+        binarized.scaler.transform(X_train))
+    assert np.isclose(cand_threshold[cand_feature == 0], binarized.threshold_[0]).any()
+    assert np.mean(binarized.predict(X) == y) >= np.mean(bigm.predict(X) == y)
+
+
+def test_n_thresholds_caps_candidates_per_feature(toy_data):
+    X, _ = toy_data
+    cand_feature, _ = ROCTTree(formulation='binarized', n_thresholds=8)._candidate_thresholds(X)
+    assert np.bincount(cand_feature).max() <= 8
+
+    cand_feature, _ = ROCTTree(formulation='binarized', n_thresholds=None)._candidate_thresholds(X)
+    np.testing.assert_array_equal(np.bincount(cand_feature), len(X) - 1)
+
+
+def test_pooled_decomposition_matches_sequential(toy_data):
+    X, y = toy_data
+    params = dict(max_depth=3, time_limit=60, use_gpu=False, solver='highs', decomposition_depth=1)
+    sequential = ROCTTree(decomposition_jobs=1, **params).fit(X, y)
+    pooled = ROCTTree(decomposition_jobs=2, **params).fit(X, y)
+
+    assert len(sequential.profile_['subproblems']) >= 3
+    np.testing.assert_array_equal(pooled.feature_, sequential.feature_)
+    np.testing.assert_allclose(pooled.threshold_, sequential.threshold_)
+    np.testing.assert_array_equal(pooled.predict(X), sequential.predict(X))
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import ensemble_roct
+from ensemble_roct import ROCTTree
+
+
+@pytest.fixture
+def torch_probes(monkeypatch):
+    """Count torch imports behind the CUDA probe, on a machine without torch"""
+    calls = []
+    monkeypatch.setattr(ensemble_roct, '_torch', lambda: calls.append(1))
+    ensemble_roct._cuda_available.cache_clear()
+    yield calls
+    ensemble_roct._cuda_available.cache_clear()
+
+
+def test_cuda_is_probed_once_per_process(toy_data, torch_probes):
+    X, y = toy_data
+    tree = ROCTTree(max_depth=1, time_limit=30)
+    tree.fit(X[:60], y[:60])
+    tree.fit(X[:60], y[:60])
+
+    assert len(torch_probes) == 1
+
+
+def test_cpu_fits_never_import_torch(toy_data, torch_probes, make_forest):
+    X, y = toy_data
+    ROCTTree(max_depth=1, time_limit=30, use_gpu=False).fit(X[:60], y[:60])
+    make_forest(n_estimators=2, solver='cbc').fit(X, y)
+
+    assert torch_probes == []
+
+
+def test_cbc_threads_fall_back_without_cuda(torch_probes):
+    assert ROCTTree(use_gpu=True)._cbc_command(10).optionsDict['threads'] == 4
+    assert ROCTTree(use_gpu=True, threads=2)._cbc_command(10).optionsDict['threads'] == 2
+
+
+def test_process_pool_matches_sequential_training(toy_data, make_forest):
+    X, y = toy_data
+    sequential = make_forest(n_jobs=1).fit(X, y)
+    pooled = make_forest(n_jobs=2).fit(X, y)
+
+    assert len(pooled.trees) == 3
+    np.testing.assert_array_equal(pooled.predict_proba(X), sequential.predict_proba(X))
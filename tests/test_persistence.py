@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from ensemble_roct import ROCTRandomForest, ROCTTree, load_model, save_model
+
+
+@pytest.fixture
+def models(make_forest, make_boosting):
+    """One small unfitted model of each kind"""
+    return {
+        'tree': ROCTTree(max_depth=2, time_limit=30, use_gpu=False, solver='highs'),
+        'forest': make_forest(n_estimators=2),
+        'boosting': make_boosting(n_estimators=2, leaf_mode='newton'),
+    }
+
+
+@pytest.mark.parametrize('mmap_mode', [None, 'r'])
+@pytest.mark.parametrize('name', ['boosting', 'forest', 'tree'])
+def test_save_load_round_trip(name, mmap_mode, toy_data, tmp_path, capsys, models):
+    X, y = toy_data
+    model = models[name].fit(X, y)
+    path = str(tmp_path / f'{name}.npz')
+
+    capsys.readouterr()
+    save_model(model, path)
+    loaded = load_model(path, mmap_mode=mmap_mode)
+    assert capsys.readouterr().out == ''
+
+    assert type(loaded) is type(model)
+    assert loaded.get_params() == model.get_params()
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    if mmap_mode == 'r':
+        tree = loaded if name == 'tree' else loaded.trees[0]
+        assert isinstance(tree.threshold_, np.memmap)
+
+
+def test_unfitted_model_cannot_be_saved(tmp_path):
+    with pytest.raises(ValueError):
+        save_model(ROCTRandomForest(), str(tmp_path / 'empty.npz'))
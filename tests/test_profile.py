@@ -0,0 +1,75 @@
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+import ensemble_roct
+from ensemble_roct import ROCTTree
+
+
+class _StalledMonitor(ensemble_roct.CBCGapMonitor):
+    """Gap monitor that reports having interrupted CBC on a stall"""
+
+    def stop(self):
+        super().stop()
+        self.interrupted = True
+        self.incumbent, self.bound = 12.0, 3.0
+
+
+def test_stalled_cbc_solve_is_recorded_as_interrupted(toy_data, monkeypatch):
+    X, y = toy_data
+    monkeypatch.setattr(ensemble_roct, 'CBCGapMonitor', _StalledMonitor)
+
+    tree = ROCTTree(max_depth=1, time_limit=30, use_gpu=False).fit(X[:60], y[:60])
+
+    assert tree.profile_['status'] == 'interrupted'
+    assert tree.profile_['stopped_early']
+    assert tree.profile_['incumbent'] == 12.0
+    assert np.isclose(tree.profile_['gap'], 0.75)
+
+
+def test_fit_is_quiet_by_default(toy_data, capsys):
+    X, y = toy_data
+    ROCTTree(max_depth=1, time_limit=30, use_gpu=False, solver='highs').fit(X, y)
+
+    assert capsys.readouterr().out == ''
+
+
+def test_build_memory_is_traced_only_on_request(toy_data):
+    X, y = toy_data
+    tree = ROCTTree(max_depth=1, time_limit=30, use_gpu=False).fit(X[:60], y[:60])
+    assert tree.profile_['build_peak_memory_mb'] is None
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        tree.fit(X[:60], y[:60])
+    finally:
+        tracemalloc.stop()
+    assert tree.profile_['build_peak_memory_mb'] > 0
+
+
+def test_time_limited_cbc_solve_is_not_reported_optimal(toy_data, monkeypatch):
+    X, y = toy_data
+    solve = ensemble_roct.LpProblem.solve
+
+    def time_limited_solve(model, solver=None, **kwargs):
+        # PuLP keeps status Optimal for a time-limited incumbent; sol_status tells them apart
+        status = solve(model, solver, **kwargs)
+        model.sol_status = ensemble_roct.LpSolutionIntegerFeasible
+        return status
+
+    tree = ROCTTree(max_depth=1, time_limit=30, use_gpu=False).fit(X[:60], y[:60])
+    assert tree.profile_['status'] == 'Optimal'
+
+    monkeypatch.setattr(ensemble_roct.LpProblem, 'solve', time_limited_solve)
+    tree.fit(X[:60], y[:60])
+    assert tree.profile_['status'] == 'Feasible'
+
+
+def test_highs_results_use_the_shared_status_vocabulary():
+    result = SimpleNamespace(status=1, x=np.zeros(3), message='Time limit reached.')
+    assert ensemble_roct._highs_status(result) == 'Feasible'
+    assert ensemble_roct._highs_status(SimpleNamespace(status=1, x=None)) == 'Not Solved'
+    assert ensemble_roct._highs_status(SimpleNamespace(status=0, x=np.zeros(3))) == 'Optimal'
+    assert ensemble_roct._highs_status(SimpleNamespace(status=2, x=None)) == 'Infeasible'
@@ -0,0 +1,88 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from ensemble_roct import ROCTTree, robustness_radius
+
+
+def _brute_force_radius(tree, X):
+    """Minimal L-infinity distance to a threshold-grid cell that the tree predicts differently"""
+    n_features = X.shape[1]
+    feature, threshold = tree.feature_[:tree.n_splits], tree.threshold_[:tree.n_splits]
+    # Thresholds live in the tree's scaled space; radii are in raw feature units
+    cuts = [np.unique(threshold[feature == f]) * tree.scaler.scale_[f] + tree.scaler.mean_[f]
+            for f in range(n_features)]
+    # Cells lower < x <= upper between consecutive thresholds of every feature
+    intervals = [list(zip(np.r_[-np.inf, c], np.r_[c, np.inf])) for c in cuts]
+    cells = list(itertools.product(*intervals))
+    lower = np.array([[lo for lo, _ in cell] for cell in cells])
+    upper = np.array([[hi for _, hi in cell] for cell in cells])
+    centre = np.where(np.isfinite(lower) & np.isfinite(upper), (lower + upper) / 2,
+                      np.where(np.isfinite(lower), lower + 1, upper - 1))
+    centre[~np.isfinite(centre)] = 0.0
+    cell_prediction = tree.predict(centre)
+
+    own = tree.predict(X)
+    dist = np.maximum(lower[None] - X[:, None], X[:, None] - upper[None]).clip(min=0).max(axis=2)
+    dist[cell_prediction[None] == own[:, None]] = np.inf
+    return dist.min(axis=1)
+
+
+def _search_attack(model, X, max_radius=3.0, n_directions=64, seed=0):
+    """Smallest flipping distance found along fixed L-infinity directions (inf if none)"""
+    rng = np.random.default_rng(seed)
+    n_features = X.shape[1]
+    corners = np.array(list(itertools.product([-1.0, 1.0], repeat=n_features)))
+    axes = np.vstack([np.eye(n_features), -np.eye(n_features)])
+    random = rng.uniform(-1, 1, size=(n_directions, n_features))
+    directions = np.vstack([corners, axes, random / np.abs(random).max(axis=1, keepdims=True)])
+    radii = np.linspace(0, max_radius, 301)[1:]
+
+    found = np.full(len(X), np.inf)
+    own = model.predict(X)
+    for i, x in enumerate(X):
+        points = x + radii[:, None, None] * directions[None]
+        flipped = (model.predict(points.reshape(-1, n_features)).reshape(len(radii), -1)
+                   != own[i]).any(axis=1)
+        if flipped.any():
+            found[i] = radii[flipped.argmax()]
+    return found
+
+
+@pytest.fixture
+def box_data():
+    rng = np.random.default_rng(5)
+    X = rng.uniform(-1, 1, size=(200, 2))
+    y = ((X[:, 0] > 0.3) & (X[:, 1] > -0.2)).astype(int)
+    return X, y
+
+
+def test_single_tree_radius_is_exact(box_data):
+    X, y = box_data
+    tree = ROCTTree(max_depth=2, time_limit=30, use_gpu=False, solver='highs').fit(X, y)
+    assert np.sum(tree.feature_[:tree.n_splits] >= 0) >= 2
+
+    rng = np.random.default_rng(6)
+    X_test = rng.uniform(-1.5, 1.5, size=(100, 2))
+    radius = robustness_radius(tree, X_test)
+
+    np.testing.assert_array_equal(radius['prediction'], tree.predict(X_test))
+    np.testing.assert_allclose(radius['lower'], _brute_force_radius(tree, X_test), atol=1e-9)
+    np.testing.assert_array_equal(radius['upper'], radius['lower'])
+
+
+def test_ensemble_lower_bound_never_exceeds_a_found_flip(toy_data, make_forest):
+    X, y = toy_data
+    forest = make_forest(max_depth=2).fit(X, y)
+
+    X_test = X[:60]
+    radius = robustness_radius(forest, X_test)
+    found = _search_attack(forest, X_test)
+
+    assert np.isfinite(found).sum() > 30
+    assert np.all(radius['lower'] <= found + 1e-9)
+    assert np.all(radius['lower'] <= radius['upper'] + 1e-9)
+    # The built-in attack returns real flipping points
+    attacked = np.isfinite(radius['upper'])
+    assert attacked.any()
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from ensemble_roct import sample_indices, smart_sampling
+
+
+@pytest.fixture
+def labels():
+    y = np.zeros(1000, dtype=int)
+    y[::20] = 1  # 50 positives
+    return y
+
+
+def test_balanced_keeps_every_positive_without_repeats(labels):
+    idx = sample_indices(labels, 200, 'balanced', random_state=0)
+
+    assert len(idx) == 200 and len(np.unique(idx)) == 200
+    np.testing.assert_array_equal(np.sort(idx[labels[idx] == 1]), np.flatnonzero(labels == 1))
+
+
+def test_stratified_keeps_the_class_ratio(labels):
+    idx = sample_indices(labels, 200, 'stratified', random_state=0)
+
+    assert len(idx) == 200
+    assert np.sum(labels[idx] == 1) == 10
+
+
+def test_bootstrap_draws_balanced_counts_with_replacement(labels):
+    idx = sample_indices(labels, 200, 'bootstrap', random_state=0)
+
+    assert len(idx) == 200
+    assert np.sum(labels[idx] == 1) == 50
+    assert len(np.unique(idx[labels[idx] == 1])) < 50
+
+
+def test_hard_negative_takes_highest_margin_negatives(labels):
+    margins = np.arange(len(labels), dtype=float)
+    idx = sample_indices(labels, 200, 'hard_negative', random_state=0, margins=margins,
+                         hard_fraction=0.5)
+
+    negatives = np.flatnonzero(labels == 0)
+    hardest = negatives[np.argsort(-margins[negatives])[:75]]
+    assert set(hardest) <= set(idx)
+
+
+def test_seeded_draws_are_reproducible_and_leave_global_rng_alone(labels):
+    np.random.seed(123)
+    state = np.random.get_state()[1].copy()
+
+    first = sample_indices(labels, 200, 'balanced', random_state=7)
+    second = sample_indices(labels, 200, 'balanced', random_state=np.random.default_rng(7))
+
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+
+def test_smart_sampling_gathers_the_sampled_rows(labels):
+    X = np.arange(len(labels), dtype=float)[:, None]
+    X_sampled, y_sampled = smart_sampling(X, labels, max_samples=200, random_state=3)
+
+    idx = sample_indices(labels, 200, 'balanced', random_state=3)
+    np.testing.assert_array_equal(X_sampled[:, 0], idx)
+    np.testing.assert_array_equal(y_sampled, labels[idx])
+
+
+def test_unknown_strategy_and_single_class_are_rejected(labels):
+    with pytest.raises(ValueError):
+        sample_indices(labels, 200, 'systematic')
+    with pytest.raises(ValueError):
+        sample_indices(np.zeros(10, dtype=int), 5)
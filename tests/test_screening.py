@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ensemble_roct import ROCTTree, screen_features
+
+
+@pytest.fixture
+def wide_data():
+    """Ten features of which only 2 and 7 carry the label"""
+    rng = np.random.default_rng(2)
+    X = rng.uniform(-1, 1, size=(300, 10))
+    y = ((X[:, 2] > 0.2) | (X[:, 7] < -0.5)).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize('method', ['auc', 'mutual_info', 'random_forest'])
+def test_screening_keeps_the_informative_features(wide_data, method):
+    X, y = wide_data
+    selected, scores = screen_features(X, y, method=method, n_features=2)
+
+    np.testing.assert_array_equal(selected, [2, 7])
+    assert scores.shape == (10,)
+
+
+def test_screening_keeps_everything_when_nothing_is_dropped(wide_data):
+    X, y = wide_data
+    selected, _ = screen_features(X, y, n_features=10)
+    np.testing.assert_array_equal(selected, np.arange(10))
+
+    with pytest.raises(ValueError):
+        screen_features(X, y, method='chi2')
+
+
+def test_screened_tree_builds_a_smaller_milp_on_the_kept_features(wide_data):
+    X, y = wide_data
+    X, y = X[:150], y[:150]
+    params = dict(max_depth=1, time_limit=30, use_gpu=False, solver='highs')
+    full = ROCTTree(**params).fit(X, y)
+    screened = ROCTTree(feature_screening='auc', n_screened_features=2, **params).fit(X, y)
+
+    np.testing.assert_array_equal(screened.selected_features_, [2, 7])
+    used = screened.feature_[screened.feature_ >= 0]
+    assert set(used) <= {2, 7}
+    assert screened.profile_['n_variables'] < full.profile_['n_variables']
+    assert np.mean(screened.predict(X) == y) >= np.mean(full.predict(X) == y) - 0.02
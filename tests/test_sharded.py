@@ -0,0 +1,44 @@
+import logging
+
+import numpy as np
+
+
+def test_sharded_accuracy_close_to_in_memory(toy_data, tmp_path, make_forest):
+    X, y = toy_data
+    path = tmp_path / 'X.npy'
+    np.save(path, X)
+
+    in_memory = make_forest().fit(X, y)
+    sharded = make_forest(sharded=True).fit(str(path), y)
+
+    assert len(sharded.trees) == 3
+    in_memory_acc = np.mean(in_memory.predict(X) == y)
+    sharded_acc = np.mean(sharded.predict(X) == y)
+    assert sharded_acc >= in_memory_acc - 0.05
+
+
+def test_shard_job_sends_only_sampled_rows(toy_data, tmp_path, make_forest):
+    X, y = toy_data
+    forest = make_forest(sharded=True)
+    forest.scaler.fit(X)
+
+    job = forest._shard_job(str(tmp_path / 'X.npy'), X, y, 0, None)
+    rows = job[3]
+    assert len(rows) == forest.max_samples
+    assert set(rows) <= set(forest._shard_rows(y, 0))
+    assert np.all(y[rows] == job[4])
+
+
+def test_sharded_fit_logs_negatives_actually_trained_on(toy_data, tmp_path, caplog, make_forest):
+    X, y = toy_data
+    path = tmp_path / 'X.npy'
+    np.save(path, X)
+
+    with caplog.at_level(logging.INFO, logger='ensemble_roct'):
+        make_forest(sharded=True).fit(str(path), y)
+
+    # Every tree keeps all positives and fills up with negatives from its own shard
+    n_pos, n_neg = int(np.sum(y == 1)), int(np.sum(y == 0))
+    n_trained = 3 * (150 - n_pos)
+    assert (f"trained on {n_trained} distinct negatives ({n_trained / n_neg:.2%} of the negatives)"
+            in caplog.text)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from ensemble_roct import (_reservoir_sample, _reservoir_update, make_creditcard_like,
+                           stream_csv_sample, write_memmap_dataset)
+
+
+@pytest.fixture
+def creditcard_csv(tmp_path):
+    path = tmp_path / 'creditcard.csv'
+    df = make_creditcard_like(n_samples=3000, n_features=6, fraud_rate=0.02, path=str(path))
+    return str(path), df
+
+
+def test_stream_sample_keeps_positives_and_exact_stats(creditcard_csv):
+    path, df = creditcard_csv
+    features = df.drop(columns='Class').to_numpy(dtype=np.float32)
+    labels = df['Class'].to_numpy()
+    n_pos = int(labels.sum())
+
+    X, y, stats = stream_csv_sample(path, max_samples=200, chunksize=700)
+
+    assert stats['n_rows'] == len(df)
+    assert stats['class_counts'] == {0: len(df) - n_pos, 1: n_pos}
+    assert len(y) == 200 and y.sum() == n_pos
+    assert X.dtype == np.float32
+
+    # Every sampled positive is a real positive row
+    positives = {row.tobytes() for row in features[labels == 1]}
+    assert all(row.tobytes() in positives for row in X[y == 1])
+
+    np.testing.assert_allclose(stats['scaler'].mean_, features.mean(axis=0, dtype=np.float64),
+                               rtol=1e-6)
+    np.testing.assert_allclose(stats['scaler'].scale_, features.std(axis=0, dtype=np.float64),
+                               rtol=1e-6)
+
+
+def test_stream_without_limit_keeps_every_row_in_order(creditcard_csv):
+    path, df = creditcard_csv
+
+    X, y, _ = stream_csv_sample(path, chunksize=700)
+
+    np.testing.assert_array_equal(X, df.drop(columns='Class').to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(y, df['Class'].to_numpy())
+
+
+def test_memmap_dataset_round_trip(creditcard_csv, tmp_path, capsys):
+    path, df = creditcard_csv
+    X_path, y_path = str(tmp_path / 'X.npy'), str(tmp_path / 'y.npy')
+
+    capsys.readouterr()
+    stats = write_memmap_dataset(path, X_path, y_path, chunksize=700)
+    assert capsys.readouterr().out == ''
+
+    X = np.load(X_path, mmap_mode='r')
+    np.testing.assert_array_equal(X, df.drop(columns='Class').to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(np.load(y_path), df['Class'].to_numpy())
+    assert stats['feature_names'] == list(df.columns[:-1])
+
+
+def test_reservoir_sample_inclusion_is_uniform_over_stream():
+    # 50 of 200 streamed rows through a 100-slot reservoir, fed in chunks of 30
+    n_rows, k, n, n_trials = 200, 100, 50, 2000
+    stream = np.arange(n_rows, dtype=np.float32)[:, None]
+    counts = np.zeros(n_rows)
+    for trial in range(n_trials):
+        rng = np.random.default_rng(trial)
+        reservoir = np.empty((k, 1), dtype=np.float32)
+        seen = 0
+        for start in range(0, n_rows, 30):
+            seen = _reservoir_update(reservoir, seen, stream[start:start + 30], rng)
+        counts[_reservoir_sample(reservoir, seen, n, rng)[:, 0].astype(int)] += 1
+
+    inclusion = counts / n_trials
+    # Each row has probability n / n_rows = 0.25; 0.06 is about six standard errors
+    np.testing.assert_allclose(inclusion, n / n_rows, atol=0.06)
+    assert abs(inclusion[:k // 2].mean() - inclusion[k // 2:].mean()) < 0.02
+
+
+def test_streaming_does_not_print(creditcard_csv, tmp_path, capsys):
+    path, _ = creditcard_csv
+    capsys.readouterr()
+
+    stream_csv_sample(path, max_samples=200, chunksize=700)
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def subspace_forest(make_forest):
+    """Forest factory drawing a feature subspace per tree"""
+    return lambda max_features: make_forest(max_samples=100, max_features=max_features)
+
+
+@pytest.mark.parametrize('max_features, size', [('sqrt', 3), ('log2', 3), (4, 4), (0.5, 4),
+                                                (None, None)])
+def test_feature_subset_size_per_tree(max_features, size, subspace_forest):
+    forest = subspace_forest(max_features)
+    subsets = [forest._feature_subset(i, 9) for i in range(3)]
+
+    if size is None:
+        assert subsets == [None] * 3
+        return
+    assert all(len(subset) == size and subset == sorted(set(subset)) for subset in subsets)
+    assert all(0 <= f < 9 for subset in subsets for f in subset)
+    # Seeded by tree index: stable across forests, different between trees
+    assert subsets == [subspace_forest(max_features)._feature_subset(i, 9) for i in range(3)]
+    assert len({tuple(subset) for subset in subsets}) > 1
+
+
+def test_unknown_max_features_is_rejected(subspace_forest):
+    with pytest.raises(ValueError):
+        subspace_forest('half')._feature_subset(0, 9)
+
+
+def test_trees_split_only_inside_their_subspace(subspace_forest):
+    rng = np.random.default_rng(4)
+    X = rng.uniform(-1, 1, size=(300, 9))
+    y = (X[:, :3].sum(axis=1) > 0.5).astype(int)
+    forest = subspace_forest('sqrt').fit(X, y)
+
+    assert len(forest.trees) == 3
+    for i, tree in enumerate(forest.trees):
+        used = tree.feature_[tree.feature_ >= 0]
+        assert set(used) <= set(forest._feature_subset(i, 9))
+    assert forest.predict(X).shape == (300,)